@@ -1,12 +1,20 @@
 import argparse
+import concurrent.futures
 import csv
+import functools
+import http.client
+import io
 import json
+import math
 import os
 import re
 import shlex
+import sys
+import threading
+import time
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Any, Callable, Dict, List, Optional, Tuple, Set
-from urllib import request
+from urllib import error, parse, request
 
 SEGMENT_ID = os.getenv("STRAVA_SEGMENT_ID", "4580190")
 SEGMENT_HISTORY_URL_TEMPLATE = "https://www.strava.com/athlete/segments/{segment_id}/history"
@@ -32,17 +40,30 @@ NAVN_CACHE_PATH = os.getenv(
     os.path.join(os.getcwd(), ".grancakongen_navn"),
 )
 
+SEGMENT_CACHE_PATH = os.getenv(
+    "GRANCAKONGEN_SEGMENTS_PATH",
+    os.path.join(os.getcwd(), ".grancakongen_segments.json"),
+)
+SEGMENT_CACHE_TTL_SECONDS = 3600
+
 CURL_SNIPPET_PATH = os.getenv(
     "STRAVA_CURL_FILE",
     os.path.join(os.getcwd(), ".strava_curl"),
 )
 
+MAX_FETCH_WORKERS = 8
+
 RESULTS_CSV_PATH = os.getenv(
     "GRANCAKONGEN_RESULTS_PATH",
     os.path.join(os.getcwd(), "results.csv"),
 )
 
 
+_CURL_LINE_CONTINUATION_RE = re.compile(r"(?:\^|`)\s*\n")
+# Numeric last path part of a segment link, ignoring any query/fragment.
+_SEGMENT_LINK_ID_RE = re.compile(r"(?:^|/)(\d+)(?:[?#][^/]*)?/*$")
+
+
 def _segment_history_url(segment_id: str) -> str:
     return SEGMENT_HISTORY_URL_TEMPLATE.format(segment_id=segment_id)
 
@@ -58,7 +79,7 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
         .replace("\\\n", " ")
         .replace("\r\n", "\n")
     )
-    normalized = re.sub(r"(?:\^|`)\s*\n", " ", normalized)
+    normalized = _CURL_LINE_CONTINUATION_RE.sub(" ", normalized)
     try:
         tokens = shlex.split(normalized, posix=True)
     except ValueError:
@@ -67,9 +88,11 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
     headers: Dict[str, str] = {}
 
     def _store(raw_value: str) -> None:
-        if not raw_value or ":" not in raw_value:
+        if not raw_value:
+            return
+        name, separator, value = raw_value.partition(":")
+        if not separator:
             return
-        name, value = raw_value.split(":", 1)
         header_name = name.strip().lower()
         if not header_name:
             return
@@ -78,9 +101,13 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
     idx = 0
     while idx < len(tokens):
         token = tokens[idx]
+        if not token.startswith("-"):
+            idx += 1
+            continue
         header_value = ""
         cookie_value = ""
-        lowered = token.lower()
+        # Only long options are matched case-insensitively.
+        lowered = token.lower() if token.startswith("--") else token
         if token == "-H":
             idx += 1
             if idx < len(tokens):
@@ -90,7 +117,7 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
             if idx < len(tokens):
                 header_value = tokens[idx]
         elif lowered.startswith("--header="):
-            header_value = token.split("=", 1)[1]
+            _, _, header_value = token.partition("=")
         elif token.startswith("-H") and len(token) > 2:
             header_value = token[2:]
         elif token == "-b":
@@ -102,7 +129,7 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
             if idx < len(tokens):
                 cookie_value = tokens[idx]
         elif lowered.startswith("--cookie="):
-            cookie_value = token.split("=", 1)[1]
+            _, _, cookie_value = token.partition("=")
         elif token.startswith("-b") and len(token) > 2:
             cookie_value = token[2:]
         if header_value:
@@ -116,15 +143,27 @@ def parse_curl_headers(curl_command: str) -> Dict[str, str]:
     return headers
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_curl_file(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    # mtime_ns and size are only part of the cache key so edits are picked up.
+    try:
+        with open(path, "r", encoding="utf-8") as curl_file:
+            return parse_curl_headers(curl_file.read())
+    except (FileNotFoundError, OSError, UnicodeDecodeError):
+        return {}
+
+
 def _load_curl_headers(path: Optional[str] = None) -> Dict[str, str]:
     effective_path = path or CURL_SNIPPET_PATH
     if not effective_path:
         return {}
     try:
-        with open(effective_path, "r", encoding="utf-8") as curl_file:
-            return parse_curl_headers(curl_file.read())
-    except (FileNotFoundError, OSError, UnicodeDecodeError):
+        stat_result = os.stat(effective_path)
+    except OSError:
         return {}
+    return dict(
+        _parse_curl_file(effective_path, stat_result.st_mtime_ns, stat_result.st_size)
+    )
 
 
 def _build_headers(
@@ -169,11 +208,171 @@ def _build_headers(
     }
 
 
+class KeepAliveSession:
+    """Reuse HTTPS connections across requests to avoid repeated TLS handshakes.
+
+    ``open`` takes a ``urllib.request.Request`` and returns a response usable as
+    a context manager, so it can stand in for ``urllib.request.urlopen``.
+    Redirects are followed like urlopen does (up to ``MAX_REDIRECTS``) and
+    non-2xx responses raise ``urllib.error.HTTPError``. Plain http URLs and
+    hosts routed through a configured HTTPS proxy are handed to
+    ``urllib.request.urlopen`` instead, so they are not pooled.
+    """
+
+    MAX_REDIRECTS = 10
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+    def __init__(self, maxsize: int = 8, timeout: float = 30.0):
+        self._maxsize = maxsize
+        self._timeout = timeout
+        self._idle: Dict[str, List[http.client.HTTPSConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, host: str) -> http.client.HTTPSConnection:
+        return http.client.HTTPSConnection(host, timeout=self._timeout)
+
+    def _acquire(self, host: str) -> Tuple[http.client.HTTPSConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(host)
+            if idle:
+                return idle.pop(), True
+        return self._connect(host), False
+
+    def _release(self, host: str, connection: http.client.HTTPSConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self._maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    @staticmethod
+    def _uses_proxy(host: str) -> bool:
+        if not request.getproxies().get("https"):
+            return False
+        return not request.proxy_bypass(host)
+
+    @staticmethod
+    def _redirected_request(
+        http_request: request.Request, location: str, status: int
+    ) -> request.Request:
+        method = http_request.get_method()
+        data = http_request.data
+        if status in (301, 302, 303) and method not in ("GET", "HEAD"):
+            method, data = "GET", None
+        headers = dict(http_request.header_items())
+        if data is None:
+            headers.pop("Content-length", None)
+            headers.pop("Content-type", None)
+        return request.Request(
+            parse.urljoin(http_request.full_url, location),
+            data=data,
+            headers=headers,
+            method=method,
+        )
+
+    def open(self, http_request: request.Request, _redirects: int = 0) -> Any:
+        url = parse.urlsplit(http_request.full_url)
+        if url.scheme != "https" or self._uses_proxy(url.hostname or ""):
+            return request.urlopen(http_request, timeout=self._timeout)
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+        headers = dict(http_request.header_items())
+
+        connection, reused = self._acquire(url.netloc)
+        while True:
+            try:
+                connection.request(
+                    http_request.get_method(),
+                    path,
+                    body=http_request.data,
+                    headers=headers,
+                )
+                response = connection.getresponse()
+                break
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server may have dropped an idle keep-alive connection.
+                connection, reused = self._connect(url.netloc), False
+
+        location = response.headers.get("Location")
+        if (
+            response.status in self.REDIRECT_STATUSES
+            and location
+            and _redirects < self.MAX_REDIRECTS
+        ):
+            response.read()
+            _PooledResponse(self, url.netloc, connection, response).close()
+            return self.open(
+                self._redirected_request(http_request, location, response.status),
+                _redirects=_redirects + 1,
+            )
+
+        if not 200 <= response.status < 300:
+            body = response.read()
+            connection.close()
+            raise error.HTTPError(
+                http_request.full_url,
+                response.status,
+                response.reason,
+                response.headers,
+                io.BytesIO(body),
+            )
+        return _PooledResponse(self, url.netloc, connection, response)
+
+    def close(self) -> None:
+        with self._lock:
+            idle_connections = [
+                connection for idle in self._idle.values() for connection in idle
+            ]
+            self._idle.clear()
+        for connection in idle_connections:
+            connection.close()
+
+
+class _PooledResponse:
+    def __init__(
+        self,
+        session: KeepAliveSession,
+        host: str,
+        connection: http.client.HTTPSConnection,
+        response: http.client.HTTPResponse,
+    ):
+        self._session = session
+        self._host = host
+        self._connection = connection
+        self._response = response
+
+    def __enter__(self) -> "_PooledResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._response.read(amt)
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        if self._response.isclosed() and not self._response.will_close:
+            self._session._release(self._host, connection)
+        else:
+            self._response.close()
+            connection.close()
+
+
 def fetch_segment_history(
     opener: Optional[Callable[[request.Request], Any]] = None,
     cookie_header: Optional[str] = None,
     csrf_token: Optional[str] = None,
     segment_id: Optional[str] = None,
+    session: Optional[KeepAliveSession] = None,
 ) -> Dict[str, Any]:
     """Return the JSON payload for the requested segment history."""
 
@@ -188,52 +387,139 @@ def fetch_segment_history(
         method="GET",
     )
 
-    open_callable = opener or request.urlopen
+    open_callable = opener or (session.open if session else request.urlopen)
     with open_callable(http_request) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+        payload = json.loads(response.read())
 
     return payload
 
 
+def fetch_segment_histories(
+    segment_ids: List[str],
+    session: Optional[KeepAliveSession] = None,
+    max_workers: int = MAX_FETCH_WORKERS,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch histories concurrently, keyed by segment id in the given order.
+
+    Segments that fail to fetch are reported and left out. Each concurrent
+    worker needs its own connection, so a shared session only saves handshakes
+    for requests beyond the first ``max_workers``.
+    """
+
+    if not segment_ids:
+        return {}
+    fetched: Dict[str, Dict[str, Any]] = {}
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(segment_ids))
+    ) as executor:
+        futures = {
+            executor.submit(
+                fetch_segment_history, segment_id=segment_id, session=session
+            ): segment_id
+            for segment_id in segment_ids
+        }
+        for future in concurrent.futures.as_completed(futures):
+            segment_id = futures[future]
+            try:
+                fetched[segment_id] = future.result()
+            except Exception as exc:
+                print(f"Failed to fetch history for segment {segment_id}: {exc}")
+    return {
+        segment_id: fetched[segment_id]
+        for segment_id in segment_ids
+        if segment_id in fetched
+    }
+
+
+def _round_half_up(number: float) -> int:
+    """Round half away from zero; exact for floats below 2**52."""
+
+    magnitude = abs(number)
+    whole = math.floor(magnitude)
+    if magnitude - whole >= 0.5:
+        whole += 1
+    return -whole if number < 0 else whole
+
+
 def _format_elapsed_time(seconds: Optional[float]) -> str:
-    if seconds is None:
+    if type(seconds) is int:
+        total_seconds = seconds
+    elif seconds is None:
         return ""
-    total_seconds = int(round(seconds))
-    minutes, remaining = divmod(total_seconds, 60)
-    return f"{minutes:02d}:{remaining:02d}"
+    else:
+        total_seconds = _round_half_up(seconds)
+    return "%02d:%02d" % divmod(total_seconds, 60)
 
 
-def efforts_to_sheet_rows(
+def _elapsed_seconds(value: Any) -> float:
+    if value is None:
+        return float("inf")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def _round_metric(value: Any) -> str:
+    if value is None or value == "" or isinstance(value, bool):
+        return ""
+    if type(value) is int:
+        return str(value)
+    if type(value) is float and abs(value) < 2.0**52:
+        return str(_round_half_up(value))
+    try:
+        rounded = Decimal(str(value)).to_integral_value(rounding=ROUND_HALF_UP)
+        return str(int(rounded))
+    except (InvalidOperation, ValueError, OverflowError):
+        return ""
+
+
+def _effort_to_sheet_cells(
+    effort: Dict[str, Any], year: str, segment_display: str, navn_column: str
+) -> List[str]:
+    elapsed = _format_elapsed_time(effort.get("elapsed_time"))
+    segment_effort_id = effort.get("id")
+    effort_url = (
+        f"https://www.strava.com/segment_efforts/{segment_effort_id}"
+        if segment_effort_id
+        else ""
+    )
+    avg_watts = _round_metric(
+        effort.get("average_watts")
+        or effort.get("avg_watts")
+        or effort.get("watts")
+        or ""
+    )
+    avg_bpm = _round_metric(
+        effort.get("average_heartrate")
+        or effort.get("average_hr")
+        or effort.get("avg_hr")
+        or ""
+    )
+    avg_cadence = _round_metric(
+        effort.get("average_cadence") or effort.get("avg_cadence") or ""
+    )
+
+    return [
+        str(year),
+        segment_display,
+        navn_column,
+        str(elapsed),
+        effort_url,
+        str(avg_watts),
+        str(avg_bpm),
+        str(avg_cadence),
+    ]
+
+
+def efforts_to_sheet_cells(
     efforts: List[Dict[str, Any]],
     segment_name_map: Optional[Dict[str, str]] = None,
     navn_value: Optional[str] = None,
-) -> List[str]:
-    rows = []
+) -> List[List[str]]:
     navn_column = (navn_value or "NAVN").strip() or "NAVN"
 
-    def _elapsed_seconds(value: Any) -> float:
-        if value is None:
-            return float("inf")
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return float("inf")
-
-    def _round_metric(value: Any) -> str:
-        if value is None or value == "":
-            return ""
-        try:
-            decimal_value = Decimal(str(value))
-        except (InvalidOperation, ValueError):
-            return ""
-        try:
-            rounded = decimal_value.to_integral_value(rounding=ROUND_HALF_UP)
-        except InvalidOperation:
-            return ""
-        return str(int(rounded))
-
     best_by_year: Dict[Tuple[str, str], Dict[str, Any]] = {}
-    order: List[Tuple[str, str]] = []
     for effort in efforts:
         date_str = effort.get("start_date_local") or effort.get("start_date") or ""
         year = date_str[:4] if len(date_str) >= 4 else ""
@@ -247,55 +533,35 @@ def efforts_to_sheet_rows(
         existing = best_by_year.get(key)
         if existing is None:
             best_by_year[key] = effort
-            order.append(key)
         else:
             if _elapsed_seconds(effort.get("elapsed_time")) < _elapsed_seconds(
                 existing.get("elapsed_time")
             ):
                 best_by_year[key] = effort
 
-    for segment_id_str, year in order:
-        effort = best_by_year[(segment_id_str, year)]
-        segment_display = (
-            (segment_name_map or {}).get(segment_id_str, segment_id_str)
-        )
-        elapsed = _format_elapsed_time(effort.get("elapsed_time"))
-        segment_effort_id = effort.get("id")
-        effort_url = (
-            f"https://www.strava.com/segment_efforts/{segment_effort_id}"
-            if segment_effort_id
-            else ""
-        )
-        avg_watts = _round_metric(
-            effort.get("average_watts")
-            or effort.get("avg_watts")
-            or effort.get("watts")
-            or ""
-        )
-        avg_bpm = _round_metric(
-            effort.get("average_heartrate")
-            or effort.get("average_hr")
-            or effort.get("avg_hr")
-            or ""
-        )
-        avg_cadence = _round_metric(
-            effort.get("average_cadence") or effort.get("avg_cadence") or ""
+    name_map = segment_name_map or {}
+    return [
+        _effort_to_sheet_cells(
+            effort,
+            year,
+            name_map.get(segment_id_str, segment_id_str),
+            navn_column,
         )
+        for (segment_id_str, year), effort in best_by_year.items()
+    ]
 
-        row = "\t".join(
-            [
-                str(year),
-                segment_display,
-                navn_column,
-                str(elapsed),
-                effort_url,
-                str(avg_watts),
-                str(avg_bpm),
-                str(avg_cadence),
-            ]
+
+def efforts_to_sheet_rows(
+    efforts: List[Dict[str, Any]],
+    segment_name_map: Optional[Dict[str, str]] = None,
+    navn_value: Optional[str] = None,
+) -> List[str]:
+    return [
+        "\t".join(row)
+        for row in efforts_to_sheet_cells(
+            efforts, segment_name_map=segment_name_map, navn_value=navn_value
         )
-        rows.append(row)
-    return rows
+    ]
 
 
 def fetch_segment_metadata(
@@ -313,47 +579,96 @@ def fetch_segment_metadata(
         content = response.read().decode("utf-8-sig")
 
     reader = csv.DictReader(content.splitlines(), delimiter="\t")
-    rows: List[Dict[str, str]] = [dict(row) for row in reader if any(row.values())]
+    rows: List[Dict[str, str]] = [row for row in reader if any(row.values())]
+    return rows
+
+
+def _read_cached_segment_rows(
+    cache_path: str = SEGMENT_CACHE_PATH,
+    max_age: float = SEGMENT_CACHE_TTL_SECONDS,
+) -> Optional[List[Dict[str, str]]]:
+    if not cache_path:
+        return None
+    try:
+        if time.time() - os.path.getmtime(cache_path) >= max_age:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            rows = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None
+    return rows
+
+
+def _write_cached_segment_rows(
+    rows: List[Dict[str, str]], cache_path: str = SEGMENT_CACHE_PATH
+) -> None:
+    if not cache_path:
+        return
+    try:
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as cache_file:
+            json.dump(rows, cache_file, ensure_ascii=False)
+    except OSError as exc:  # pragma: no cover - filesystem issues are user facing
+        print(f"Failed to write {cache_path}: {exc}")
+
+
+def load_segment_metadata(
+    refresh: bool = False,
+    cache_path: str = SEGMENT_CACHE_PATH,
+    opener: Optional[Callable[[request.Request], Any]] = None,
+) -> List[Dict[str, str]]:
+    """Return sheet metadata rows, using the on-disk cache while it is fresh."""
+
+    if not refresh:
+        cached = _read_cached_segment_rows(cache_path=cache_path)
+        if cached is not None:
+            return cached
+    rows = fetch_segment_metadata(opener=opener)
+    if rows:
+        _write_cached_segment_rows(rows, cache_path=cache_path)
     return rows
 
 
 def _segment_id_from_link(link: str) -> str:
     if not link:
         return ""
-    cleaned = link.strip()
-    if not cleaned:
-        return ""
-    cleaned = cleaned.rstrip("/")
-    last_part = cleaned.split("/")[-1]
-    if "?" in last_part:
-        last_part = last_part.split("?", 1)[0]
-    if "#" in last_part:
-        last_part = last_part.split("#", 1)[0]
-    return last_part if last_part.isdigit() else ""
+    match = _SEGMENT_LINK_ID_RE.search(link.strip())
+    return match.group(1) if match else ""
 
 
-def build_segment_name_map(rows: List[Dict[str, str]]) -> Dict[str, str]:
+def _index_segment_rows(
+    rows: List[Dict[str, str]],
+) -> Tuple[Dict[str, str], List[str]]:
+    """Return the id -> Id-navn map and unique segment ids in one pass."""
+
     mapping: Dict[str, str] = {}
+    segment_ids: List[str] = []
+    seen: Set[str] = set()
     for row in rows:
-        link = (row.get("Segment") or "").strip()
+        segment_id = _segment_id_from_link((row.get("Segment") or "").strip())
+        if not segment_id:
+            continue
         id_navn = (row.get("Id-navn") or "").strip()
-        segment_id = _segment_id_from_link(link)
-        if segment_id and id_navn:
+        if id_navn:
             mapping[segment_id] = id_navn
-    return mapping
+        if segment_id not in seen:
+            seen.add(segment_id)
+            segment_ids.append(segment_id)
+    return mapping, segment_ids
+
+
+def build_segment_name_map(rows: List[Dict[str, str]]) -> Dict[str, str]:
+    return _index_segment_rows(rows)[0]
 
 
 def extract_segment_ids(rows: List[Dict[str, str]]) -> List[str]:
     """Return unique segment ids from the metadata rows in sheet order."""
 
-    segment_ids: List[str] = []
-    seen: Set[str] = set()
-    for row in rows:
-        segment_id = _segment_id_from_link((row.get("Segment") or "").strip())
-        if segment_id and segment_id not in seen:
-            seen.add(segment_id)
-            segment_ids.append(segment_id)
-    return segment_ids
+    return _index_segment_rows(rows)[1]
 
 
 def fetch_athlete_names(
@@ -376,7 +691,8 @@ def fetch_athlete_names(
     except Exception:
         return []
 
-    rows = list(csv.reader(content.splitlines(), delimiter="\t"))
+    lines = content.splitlines()
+    rows = list(csv.reader(lines, delimiter="\t"))
     if not rows:
         return []
 
@@ -399,7 +715,7 @@ def fetch_athlete_names(
     _append_from_column(data_rows, column_index)
 
     if not names:
-        reader = csv.DictReader(content.splitlines(), delimiter="\t")
+        reader = csv.DictReader(lines, delimiter="\t")
         name_column: Optional[str] = None
         for row in reader:
             if name_column is None:
@@ -497,7 +813,9 @@ def _write_results_csv(
     if not path:
         return
     try:
-        with open(path, "w", encoding="utf-8", newline="") as csv_file:
+        with open(
+            path, "w", encoding="utf-8", newline="", buffering=1 << 20
+        ) as csv_file:
             writer = csv.writer(csv_file)
             writer.writerow(header_columns)
             writer.writerows(rows)
@@ -521,14 +839,20 @@ def main() -> None:
         action="store_false",
         help="Output the raw JSON payload(s) from Strava.",
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the cached segment list and fetch it from the sheet again.",
+    )
     parser.set_defaults(all_segments=True)
     args = parser.parse_args()
 
     segment_rows: List[Dict[str, str]] = []
     segment_name_map: Dict[str, str] = {}
+    segment_ids: List[str] = []
     try:
-        segment_rows = fetch_segment_metadata()
-        segment_name_map = build_segment_name_map(segment_rows)
+        segment_rows = load_segment_metadata(refresh=args.refresh)
+        segment_name_map, segment_ids = _index_segment_rows(segment_rows)
         print("Segment definitions (Id-navn -> Segment):")
         for row in segment_rows:
             id_navn = row.get("Id-navn", "")
@@ -539,16 +863,14 @@ def main() -> None:
     except Exception as exc:  # pragma: no cover - optional network call
         print(f"Failed to fetch segment metadata: {exc}")
 
-    segment_ids = extract_segment_ids(segment_rows)
     if not segment_ids:
         segment_ids = [str(SEGMENT_ID)]
 
-    segment_histories: Dict[str, Dict[str, Any]] = {}
-    for segment_id in segment_ids:
-        try:
-            segment_histories[segment_id] = fetch_segment_history(segment_id=segment_id)
-        except Exception as exc:  # pragma: no cover - optional network call
-            print(f"Failed to fetch history for segment {segment_id}: {exc}")
+    session = KeepAliveSession(maxsize=MAX_FETCH_WORKERS)
+    try:
+        segment_histories = fetch_segment_histories(segment_ids, session=session)
+    finally:
+        session.close()
 
     if args.all_segments:
         navn_value = load_or_prompt_navn(
@@ -571,15 +893,13 @@ def main() -> None:
             "avg Cadence",
         ]
         header = "\t".join(header_columns)
-        sheet_rows = efforts_to_sheet_rows(
+        csv_rows = efforts_to_sheet_cells(
             efforts,
             segment_name_map=segment_name_map,
             navn_value=navn_value,
         )
-        print(header)
-        for row in sheet_rows:
-            print(row)
-        csv_rows: List[List[str]] = [row.split("\t") for row in sheet_rows]
+        output_lines = [header] + ["\t".join(row) for row in csv_rows]
+        sys.stdout.write("\n".join(output_lines) + "\n")
         _write_results_csv(header_columns, csv_rows)
         print(f"\nSaved {len(csv_rows)} rows to {RESULTS_CSV_PATH}")
     else:
@@ -24,6 +24,50 @@ class BytesResponse:
         return self._payload.read()
 
 
+class FakeHTTPResponse:
+    def __init__(self, payload: bytes, status: int = 200, headers=None):
+        self._payload = io.BytesIO(payload)
+        self.status = status
+        self.reason = "OK" if status == 200 else "Error"
+        self.headers = headers or {}
+        self.will_close = False
+
+    def read(self, amt=None):
+        return self._payload.read() if amt is None else self._payload.read(amt)
+
+    def isclosed(self):
+        return self._payload.tell() == len(self._payload.getvalue())
+
+    def close(self):
+        pass
+
+
+class FakeHTTPSConnection:
+    instances = []
+    # Queued results for getresponse(); an exception instance is raised.
+    responses = []
+
+    def __init__(self, host, timeout=None):
+        self.host = host
+        self.requests = []
+        self.closed = False
+        FakeHTTPSConnection.instances.append(self)
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append((method, path, headers))
+
+    def getresponse(self):
+        if FakeHTTPSConnection.responses:
+            result = FakeHTTPSConnection.responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return FakeHTTPResponse(b'{"efforts": []}')
+
+    def close(self):
+        self.closed = True
+
+
 class SegmentHistoryTest(unittest.TestCase):
     def test_parse_curl_headers_extracts_values(self):
         curl_text = """curl 'https://www.strava.com/athlete/segments/123/history' \\
@@ -106,6 +150,29 @@ class SegmentHistoryTest(unittest.TestCase):
         self.assertEqual(headers["X-CSRF-Token"], "token123")
         self.assertEqual(headers["User-Agent"], "UA/99")
 
+    def test_load_curl_headers_reuses_parsed_file_until_modified(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            curl_path = os.path.join(temp_dir, "curl.txt")
+            with open(curl_path, "w", encoding="utf-8") as curl_file:
+                curl_file.write("curl 'x' -H 'X-CSRF-Token: first'")
+
+            with mock.patch.object(
+                segment_history,
+                "parse_curl_headers",
+                wraps=segment_history.parse_curl_headers,
+            ) as parse_mock:
+                first = segment_history._load_curl_headers(curl_path)
+                second = segment_history._load_curl_headers(curl_path)
+                self.assertEqual(parse_mock.call_count, 1)
+
+                with open(curl_path, "w", encoding="utf-8") as curl_file:
+                    curl_file.write("curl 'x' -H 'X-CSRF-Token: second-token'")
+                third = segment_history._load_curl_headers(curl_path)
+
+        self.assertEqual(first["x-csrf-token"], "first")
+        self.assertEqual(second, first)
+        self.assertEqual(third["x-csrf-token"], "second-token")
+
     def test_fetch_segment_history_returns_efforts(self):
         payload = {"efforts": [{"id": 1, "elapsed_time": 120}]}
 
@@ -135,6 +202,152 @@ class SegmentHistoryTest(unittest.TestCase):
         self.assertIn("efforts", result)
         self.assertEqual(result["efforts"], payload["efforts"])
 
+    def _fake_connections(self):
+        FakeHTTPSConnection.instances = []
+        FakeHTTPSConnection.responses = []
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(
+            mock.patch.object(
+                segment_history.http.client, "HTTPSConnection", FakeHTTPSConnection
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(segment_history.request, "getproxies", lambda: {})
+        )
+        stack.enter_context(
+            mock.patch.dict(
+                os.environ,
+                {"STRAVA_COOKIE_HEADER": "cookie=1", "STRAVA_CSRF_TOKEN": "token"},
+                clear=False,
+            )
+        )
+
+    def test_keep_alive_session_reuses_connection(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+
+        for segment_id in ("1", "2"):
+            result = segment_history.fetch_segment_history(
+                segment_id=segment_id, session=session
+            )
+            self.assertEqual(result, {"efforts": []})
+
+        self.assertEqual(len(FakeHTTPSConnection.instances), 1)
+        connection = FakeHTTPSConnection.instances[0]
+        self.assertEqual(connection.host, "www.strava.com")
+        self.assertEqual(
+            [path for _, path, _ in connection.requests],
+            ["/athlete/segments/1/history", "/athlete/segments/2/history"],
+        )
+        session.close()
+        self.assertTrue(connection.closed)
+
+    def test_keep_alive_session_retries_stale_connection(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+        self.addCleanup(session.close)
+
+        segment_history.fetch_segment_history(segment_id="1", session=session)
+        FakeHTTPSConnection.responses = [
+            segment_history.http.client.RemoteDisconnected("idle timeout")
+        ]
+        result = segment_history.fetch_segment_history(segment_id="2", session=session)
+
+        self.assertEqual(result, {"efforts": []})
+        stale, fresh = FakeHTTPSConnection.instances
+        self.assertTrue(stale.closed)
+        self.assertEqual(
+            [path for _, path, _ in fresh.requests], ["/athlete/segments/2/history"]
+        )
+
+    def test_keep_alive_session_does_not_retry_fresh_connection(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+        FakeHTTPSConnection.responses = [ConnectionResetError("reset")]
+
+        with self.assertRaises(ConnectionResetError):
+            segment_history.fetch_segment_history(segment_id="1", session=session)
+
+        self.assertEqual(len(FakeHTTPSConnection.instances), 1)
+        self.assertTrue(FakeHTTPSConnection.instances[0].closed)
+
+    def test_keep_alive_session_raises_http_error_for_non_2xx(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+        FakeHTTPSConnection.responses = [FakeHTTPResponse(b"denied", status=403)]
+
+        with self.assertRaises(segment_history.error.HTTPError) as caught:
+            segment_history.fetch_segment_history(segment_id="1", session=session)
+
+        self.assertEqual(caught.exception.code, 403)
+        self.assertEqual(caught.exception.read(), b"denied")
+        self.assertTrue(FakeHTTPSConnection.instances[0].closed)
+        self.assertEqual(session._idle, {})
+
+    def test_keep_alive_session_follows_redirects(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+        self.addCleanup(session.close)
+        FakeHTTPSConnection.responses = [
+            FakeHTTPResponse(
+                b"", status=302, headers={"Location": "/athlete/segments/7/history"}
+            ),
+        ]
+
+        result = segment_history.fetch_segment_history(segment_id="1", session=session)
+
+        self.assertEqual(result, {"efforts": []})
+        self.assertEqual(len(FakeHTTPSConnection.instances), 1)
+        requests = FakeHTTPSConnection.instances[0].requests
+        self.assertEqual(
+            [path for _, path, _ in requests],
+            ["/athlete/segments/1/history", "/athlete/segments/7/history"],
+        )
+        self.assertEqual(requests[1][2]["Cookie"], "cookie=1")
+
+    def test_keep_alive_session_uses_urlopen_behind_proxy(self):
+        self._fake_connections()
+        session = segment_history.KeepAliveSession()
+        payload = b'{"efforts": [{"id": 5}]}'
+
+        with mock.patch.object(
+            segment_history.request,
+            "getproxies",
+            lambda: {"https": "http://proxy.example:3128"},
+        ), mock.patch.object(
+            segment_history.request, "proxy_bypass", lambda host: False
+        ), mock.patch.object(
+            segment_history.request,
+            "urlopen",
+            side_effect=lambda req, timeout=None: BytesResponse(payload),
+        ) as urlopen_mock:
+            result = segment_history.fetch_segment_history(
+                segment_id="1", session=session
+            )
+
+        self.assertEqual(result, {"efforts": [{"id": 5}]})
+        urlopen_mock.assert_called_once()
+        self.assertEqual(FakeHTTPSConnection.instances, [])
+
+    def test_fetch_segment_histories_keeps_order_and_skips_failures(self):
+        def fake_fetch(segment_id=None, session=None):
+            if segment_id == "2":
+                raise ValueError("boom")
+            return {"segment": segment_id}
+
+        buffer = io.StringIO()
+        with mock.patch.object(
+            segment_history, "fetch_segment_history", side_effect=fake_fetch
+        ), contextlib.redirect_stdout(buffer):
+            histories = segment_history.fetch_segment_histories(
+                ["3", "1", "2", "4"], max_workers=4
+            )
+
+        self.assertEqual(list(histories), ["3", "1", "4"])
+        self.assertEqual(histories["1"], {"segment": "1"})
+        self.assertIn("Failed to fetch history for segment 2: boom", buffer.getvalue())
+
     def test_efforts_to_sheet_rows_formats_columns(self):
         effort = {
             "start_date_local": "2024-05-01T10:00:00Z",
@@ -169,6 +382,54 @@ class SegmentHistoryTest(unittest.TestCase):
             ),
         )
 
+    def test_efforts_to_sheet_rows_rounds_metrics_half_up(self):
+        effort = {
+            "start_date_local": "2024-05-01T10:00:00Z",
+            "segment": {"id": 555},
+            "elapsed_time": 60,
+            "id": 1,
+            "avg_watts": 250,
+            "average_hr": "149.5",
+            "avg_cadence": "n/a",
+        }
+
+        rows = segment_history.efforts_to_sheet_rows([effort], navn_value="Test")
+
+        self.assertEqual(rows[0].split("\t")[5:], ["250", "150", ""])
+
+        cases = [
+            (320.5, "321"),
+            (89.4, "89"),
+            (-2.5, "-3"),
+            (-2.4, "-2"),
+            (0.49999999999999994, "0"),
+            (True, ""),
+            (float("nan"), ""),
+            ("12345678901234567891", "12345678901234567891"),
+            ("-7.5", "-8"),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(segment_history._round_metric(value), expected)
+
+    def test_format_elapsed_time_rounds_half_up(self):
+        cases = [
+            (83, "01:23"),
+            (3600, "60:00"),
+            (62.5, "01:03"),
+            (62.4, "01:02"),
+            (119.5, "02:00"),
+            (0.49999999999999994, "00:00"),
+            # Negative halves round away from zero, like _round_metric.
+            (-0.5, "-1:59"),
+            (None, ""),
+        ]
+        for seconds, expected in cases:
+            with self.subTest(seconds=seconds):
+                self.assertEqual(
+                    segment_history._format_elapsed_time(seconds), expected
+                )
+
     def test_efforts_to_sheet_rows_picks_fastest_per_year(self):
         efforts = [
             {
@@ -229,6 +490,21 @@ class SegmentHistoryTest(unittest.TestCase):
 
         self.assertEqual(result, ["1", "2", "3"])
 
+    def test_segment_id_from_link_variants(self):
+        cases = {
+            "https://www.strava.com/segments/4580190": "4580190",
+            "https://www.strava.com/segments/4580190/": "4580190",
+            " https://www.strava.com/segments/42#efforts ": "42",
+            "4580190": "4580190",
+            "https://www.strava.com/segments/soria": "",
+            "": "",
+        }
+        for link, expected in cases.items():
+            with self.subTest(link=link):
+                self.assertEqual(
+                    segment_history._segment_id_from_link(link), expected
+                )
+
     def test_fetch_segment_metadata_reads_tsv(self):
         tsv = "Id-navn\tSegment\nsoria\thttps://www.strava.com/segments/4580190\n"
 
@@ -246,6 +522,38 @@ class SegmentHistoryTest(unittest.TestCase):
             rows[0]["Segment"], "https://www.strava.com/segments/4580190"
         )
 
+    def test_load_segment_metadata_uses_fresh_cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "segments.json")
+            cached_rows = [{"Id-navn": "soria", "Segment": "https://x/segments/1"}]
+            with open(cache_path, "w", encoding="utf-8") as cache_file:
+                json.dump(cached_rows, cache_file)
+
+            rows = segment_history.load_segment_metadata(
+                cache_path=cache_path,
+                opener=lambda _: self.fail("should not fetch when cache is fresh"),
+            )
+
+            self.assertEqual(rows, cached_rows)
+
+    def test_load_segment_metadata_refresh_refetches_and_persists(self):
+        tsv = "Id-navn\tSegment\nayacata\thttps://www.strava.com/segments/2\n"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "segments.json")
+            with open(cache_path, "w", encoding="utf-8") as cache_file:
+                json.dump([{"Id-navn": "old", "Segment": ""}], cache_file)
+
+            rows = segment_history.load_segment_metadata(
+                refresh=True,
+                cache_path=cache_path,
+                opener=lambda _: BytesResponse(tsv.encode("utf-8")),
+            )
+
+            self.assertEqual(rows[0]["Id-navn"], "ayacata")
+            with open(cache_path, "r", encoding="utf-8") as cache_file:
+                self.assertEqual(json.load(cache_file), rows)
+
     def test_load_or_prompt_navn_prefers_cached_value(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             cache_path = os.path.join(temp_dir, "navn.txt")